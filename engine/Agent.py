@@ -3,19 +3,34 @@ Agent Workflow Execution System
 Autonomous agent execution with YAML configuration
 """
 
+import ast
 import json
 import logging
 import asyncio
 import threading
 import re
+import traceback
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import concurrent.futures
 from .YAMLParser import YAMLParser
 from .llms import get_llm_response
-from .memory import store_context, retrieve_context, clear_memory, get_memory_stats
+from .memory import store_context, retrieve_context, clear_memory, get_memory_stats, persist_memory
 from .mcp_manager import MCPManager
 
+# Optional: libuv-based event loop (pip install uvloop; not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional: orjson reads and pretty-prints the raw.json backup several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Global logger instance
 logger = None
 
@@ -25,6 +40,21 @@ mcp_manager = None
 # Global lock for thread-safe file operations (prevents race conditions in parallel workflows)
 context_lock = threading.Lock()
 
+# Tool call markup in LLM responses, compiled once instead of on every response
+_TOOL_BLOCK_RE = re.compile(r'\[TOOL_CALLS\](.*?)\[/TOOL_CALLS\]', re.DOTALL)
+_TOOL_CALL_RE = re.compile(r'(\w+)\.(\w+)\s*\(')
+
+# Characters that can change _find_args_end's state, keyed by the delimiter of
+# the string being scanned (None outside strings). The regex engine skips all
+# other characters in C rather than one Python loop step per character.
+_SCAN_STOPS = {
+    None: re.compile(r'[\'"()]'),
+    "'": re.compile(r"[\\']"),
+    '"': re.compile(r'[\\"]'),
+    "'''": re.compile(r"[\\']"),
+    '"""': re.compile(r'[\\"]'),
+}
+
 
 def setup_logging():
     """Setup logging to both file and console with timestamps"""
@@ -90,6 +120,24 @@ def load_yaml_data(file_path):
         raise
 
 
+def _write_context_file(context_file: Path, data: dict):
+    """Write the raw.json backup as indented UTF-8 JSON"""
+    if orjson is not None:
+        context_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(context_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _read_context_file(context_file: Path) -> dict:
+    """Read the raw.json backup; raises json.JSONDecodeError if it is corrupted"""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(context_file.read_bytes())
+    with open(context_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 def clear_context():
     """Clear/reset the context file for a fresh start"""
     logger.info("Clearing context for fresh workflow start") # type: ignore
@@ -105,8 +153,7 @@ def clear_context():
             "conversations": []
         }
         
-        with open(context_file, "w", encoding="utf-8") as f:
-            json.dump(initial_data, f, indent=2, ensure_ascii=False)
+        _write_context_file(context_file, initial_data)
         
         logger.debug(f"JSON context file reset: {context_file}")
     
@@ -131,8 +178,7 @@ def save_to_context(role, response):
         # Read existing data
         if context_file.exists():
             try:
-                with open(context_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = _read_context_file(context_file)
             except json.JSONDecodeError:
                 # If file is corrupted, reinitialize
                 logger.warning("Context file corrupted, reinitializing...")
@@ -148,8 +194,7 @@ def save_to_context(role, response):
         })
         
         # Write back to file
-        with open(context_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        _write_context_file(context_file, data)
         
         logger.debug(f"Saved to JSON backup: {context_file}")
     
@@ -161,6 +206,77 @@ def save_to_context(role, response):
     logger.debug(f"Context saved in {elapsed:.3f}s")
 
 
+def _find_args_end(text: str) -> Optional[int]:
+    """
+    Find the ')' that closes a tool call whose arguments start at text[0].
+    
+    Parentheses inside single-, double- and triple-quoted strings are ignored,
+    and a backslash inside a string escapes the next character.
+    
+    Args:
+        text: Text following the call's opening parenthesis
+        
+    Returns:
+        Index of the closing parenthesis, or None if the call is never closed
+    """
+    depth = 1
+    quote = None  # Delimiter of the string being scanned, None outside strings
+    i = 0
+    while True:
+        match = _SCAN_STOPS[quote].search(text, i)
+        if match is None:
+            return None
+        i = match.start()
+        char = text[i]
+        if quote is None:
+            if char in '"\'':
+                if text.startswith(char * 3, i):
+                    quote = char * 3
+                    i += 3
+                    continue
+                quote = char
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    return i
+        elif char == '\\':
+            i += 2
+            continue
+        elif len(quote) == 3:
+            if text.startswith(quote, i):
+                quote = None
+                i += 3
+                continue
+        elif char == quote:
+            quote = None
+        i += 1
+
+
+def _parse_args(args_str: str) -> tuple:
+    """
+    Parse a tool call's positional arguments into a tuple.
+    
+    Plain double-quoted strings and numbers parse as a JSON array with the
+    C decoder; anything JSON rejects (single or triple quotes, trailing
+    commas, Python escapes) falls back to ast.literal_eval.
+    
+    Args:
+        args_str: Text between the call's parentheses
+        
+    Returns:
+        Tuple of argument values
+    """
+    if not args_str:
+        return ()
+    try:
+        return tuple(json.loads(f"[{args_str}]"))
+    except ValueError:
+        eval_str = f"({args_str},)" if not args_str.endswith(',') else f"({args_str})"
+        return ast.literal_eval(eval_str)
+
+
 async def parse_and_execute_tool_calls(response: str, mcp_tools: list) -> str:
     """
     Parse tool calls from LLM response and execute them.
@@ -179,8 +295,7 @@ async def parse_and_execute_tool_calls(response: str, mcp_tools: list) -> str:
         return response
     
     # Find tool call blocks
-    tool_block_pattern = r'\[TOOL_CALLS\](.*?)\[/TOOL_CALLS\]'
-    matches = re.findall(tool_block_pattern, response, re.DOTALL)
+    matches = _TOOL_BLOCK_RE.findall(response)
     
     if not matches:
         return response
@@ -190,11 +305,9 @@ async def parse_and_execute_tool_calls(response: str, mcp_tools: list) -> str:
     # Parse and execute each tool call
     tool_results = []
     for block in matches:
-        import ast
-        
         # Find all function calls by looking for the pattern category.function(
         func_starts = []
-        for match in re.finditer(r'(\w+)\.(\w+)\s*\(', block):
+        for match in _TOOL_CALL_RE.finditer(block):
             func_starts.append({
                 'start': match.start(),
                 'category': match.group(1),
@@ -222,63 +335,7 @@ async def parse_and_execute_tool_calls(response: str, mcp_tools: list) -> str:
                 # Extract substring and find matching parenthesis
                 substring = block[args_start:search_end]
                 
-                # Count parentheses to find the matching close
-                paren_depth = 1
-                in_string = False
-                string_char = None
-                triple_quote = False
-                escape_next = False
-                args_end = None
-                
-                i = 0
-                while i < len(substring):
-                    char = substring[i]
-                    
-                    if escape_next:
-                        escape_next = False
-                        i += 1
-                        continue
-                    
-                    if char == '\\' and in_string:
-                        escape_next = True
-                        i += 1
-                        continue
-                    
-                    # Check for triple quotes
-                    if i + 2 < len(substring) and substring[i:i+3] in ('"""', "'''"):
-                        if not in_string:
-                            in_string = True
-                            triple_quote = True
-                            string_char = substring[i:i+3]
-                            i += 3
-                            continue
-                        elif triple_quote and substring[i:i+3] == string_char:
-                            in_string = False
-                            triple_quote = False
-                            string_char = None
-                            i += 3
-                            continue
-                    
-                    # Check for single/double quotes
-                    if char in ('"', "'") and not triple_quote:
-                        if not in_string:
-                            in_string = True
-                            string_char = char
-                        elif char == string_char:
-                            in_string = False
-                            string_char = None
-                    
-                    # Count parentheses only when not in string
-                    if not in_string:
-                        if char == '(':
-                            paren_depth += 1
-                        elif char == ')':
-                            paren_depth -= 1
-                            if paren_depth == 0:
-                                args_end = i
-                                break
-                    
-                    i += 1
+                args_end = _find_args_end(substring)
                 
                 if args_end is None:
                     logger.warning(f"Could not find matching parenthesis for {function_name}")
@@ -318,20 +375,13 @@ async def parse_and_execute_tool_calls(response: str, mcp_tools: list) -> str:
                             elif content_part.startswith("'''") and content_part.endswith("'''"):
                                 content_part = content_part[3:-3]
                             args = {"filepath": filepath_part, "content": content_part}
-                            parsed_args = None  # Skip ast.literal_eval
+                            parsed_args = None  # Skip _parse_args
                         else:
-                            # Fallback to ast
-                            eval_str = f"({args_str},)"
-                            parsed_args = ast.literal_eval(eval_str)
+                            parsed_args = _parse_args(args_str)
                     else:
-                        # Use ast.literal_eval for other cases
-                        if args_str:
-                            eval_str = f"({args_str},)" if not args_str.endswith(',') else f"({args_str})"
-                            parsed_args = ast.literal_eval(eval_str)
-                        else:
-                            parsed_args = ()
+                        parsed_args = _parse_args(args_str)
                     
-                    # Convert parsed_args to dict if we used ast.literal_eval
+                    # Convert parsed_args to dict unless parsed manually above
                     if parsed_args is not None:
                         # Convert to dict based on function
                         if function_name in ['create_file', 'write_file']:
@@ -362,8 +412,8 @@ async def parse_and_execute_tool_calls(response: str, mcp_tools: list) -> str:
                 
             except Exception as e:
                 logger.error(f"Tool execution failed for {function_name}: {e}")
-                import traceback
-                logger.debug(traceback.format_exc())
+                # exc_info defers formatting the traceback until the record is emitted
+                logger.debug("Tool call traceback:", exc_info=True)
                 tool_results.append(f"✗ {function_name}: Error - {str(e)}")
     
     # Append results to response
@@ -681,7 +731,6 @@ def run_agent(yaml_file):
             logger.error(f"Failed after: {total_duration:.2f} seconds")
             logger.error("="*80)
             
-            import traceback
             logger.error("Full traceback:")
             logger.error(traceback.format_exc())
             
@@ -695,10 +744,16 @@ def run_agent(yaml_file):
                     logger.debug("MCP shutdown cancelled (expected during cleanup)")
                 except Exception as e:
                     logger.warning(f"Error during MCP shutdown: {e}")
+            
+            # Write the RAG index once, after all of the run's stores
+            persist_memory()
     
     # Run the async workflow
     try:
-        asyncio.run(async_workflow())
+        if uvloop is not None:
+            uvloop.run(async_workflow())
+        else:
+            asyncio.run(async_workflow())
     except KeyboardInterrupt:
         logger.info("Workflow interrupted by user")
     except Exception:
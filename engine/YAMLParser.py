@@ -1,9 +1,26 @@
 import yaml
 import os
+import copy
+import functools
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional
 from dotenv import load_dotenv
 
+# libyaml-backed loader when PyYAML was built with it, otherwise the pure-Python one
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_file(path: str, mtime_ns: int) -> Any:
+    """
+    Load a YAML file, memoized per path and modification time.
+    
+    `mtime_ns` is only part of the cache key, so editing the file makes
+    earlier results unreachable.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        return yaml.load(file, Loader=_YAML_LOADER)
+
 
 class YAMLParser:
     """
@@ -45,10 +62,30 @@ class YAMLParser:
     
     def load_yaml(self) -> Dict[str, Any]:
         """Load and parse the YAML file."""
+        try:
+            path = os.path.abspath(self.file_path)
+            raw_data = _load_yaml_file(path, os.stat(path).st_mtime_ns)
+            # parse() modifies raw_data, so each parser gets its own copy
+            self.raw_data = copy.deepcopy(raw_data)
+            return self.raw_data
+        except FileNotFoundError:
+            raise FileNotFoundError(f"YAML file not found: {self.file_path}")
+        except yaml.YAMLError as e:
+            raise ValueError(f"Error parsing YAML file: {e}")
+    
+    def iter_documents(self) -> Iterator[Any]:
+        """
+        Lazily load each document of a multi-document YAML file.
+        
+        Documents separated by '---' are constructed one at a time as the
+        stream is read, so only the current document is held in memory.
+        
+        Yields:
+            Raw data of each document, in file order
+        """
         try:
             with open(self.file_path, 'r', encoding='utf-8') as file:
-                self.raw_data = yaml.safe_load(file)
-                return self.raw_data
+                yield from yaml.load_all(file, Loader=_YAML_LOADER)
         except FileNotFoundError:
             raise FileNotFoundError(f"YAML file not found: {self.file_path}")
         except yaml.YAMLError as e:
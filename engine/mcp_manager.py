@@ -18,6 +18,12 @@ import traceback
 
 logger = logging.getLogger(__name__)
 
+# Buffer limit of the server's stdout/stderr readers. Each JSON-RPC message
+# is one line, so this caps the message size (asyncio's default is 64 KiB,
+# smaller than a large file read), and the pipe is only paused for
+# backpressure once twice this much is buffered.
+STREAM_LIMIT = 16 * 1024 * 1024
+
 
 @asynccontextmanager
 async def custom_stdio_client(params: StdioServerParameters):
@@ -40,14 +46,14 @@ async def custom_stdio_client(params: StdioServerParameters):
     write_stream, write_stream_reader = anyio.create_memory_object_stream(100)
     
     # Prepare environment - merge with system env to avoid issues
-    import os
     full_env = os.environ.copy()
     if env:
         full_env.update(env)
     
-    # Add flags to reset asyncio state
+    # Unbuffered output so each JSON-RPC line reaches us as soon as it is written.
+    # PYTHONASYNCIODEBUG is deliberately not set: asyncio treats any non-empty
+    # value (even '0') as enabling debug mode, which slows every server's event loop.
     full_env['PYTHONUNBUFFERED'] = '1'
-    full_env['PYTHONASYNCIODEBUG'] = '0'
     
     # Use asyncio directly to avoid anyio/Windows issues
     # On Windows, use CREATE_NO_WINDOW to create process with fresh state
@@ -55,7 +61,8 @@ async def custom_stdio_client(params: StdioServerParameters):
         'stdin': asyncio.subprocess.PIPE,
         'stdout': asyncio.subprocess.PIPE,
         'stderr': asyncio.subprocess.PIPE,
-        'env': full_env
+        'env': full_env,
+        'limit': STREAM_LIMIT
     }
     
     # Windows-specific: use creation flags to isolate process
@@ -78,12 +85,12 @@ async def custom_stdio_client(params: StdioServerParameters):
                         break
                     
                     try:
-                        line_str = line.decode('utf-8').strip()
-                        if not line_str:
+                        if line.isspace():
                             continue
-                            
-                        # Parse JSON-RPC message
-                        message = types.JSONRPCMessage.model_validate_json(line_str)
+
+                        # Parse JSON-RPC message straight from the raw bytes: pydantic
+                        # decodes UTF-8 and skips the trailing newline in the same pass
+                        message = types.JSONRPCMessage.model_validate_json(line)
                         session_message = SessionMessage(message)
                         await read_stream_writer.send(session_message)
                     except Exception as exc:
@@ -202,21 +209,44 @@ class MCPManager:
             return
         
         logger.info("Initializing MCP Tools...")
+        started = {}
         for tool_name, config in self.mcp_tools_config.items():
             try:
-                await self._start_server(tool_name, config)
+                started[tool_name] = await self._start_server(tool_name, config)
             except Exception as e:
-                logger.error(f"Failed to initialize {tool_name}: {e}")
-                logger.error(traceback.format_exc())
-                logger.warning(f"Continuing without this tool...")
+                self._log_init_failure(tool_name, e)
+        
+        # Handshakes run concurrently so the servers' startup times overlap.
+        # Sessions are entered above, in this task, because their anyio task
+        # groups must be exited by the same task during shutdown.
+        results = await asyncio.gather(
+            *(self._load_tools(session) for session in started.values()),
+            return_exceptions=True
+        )
+        # Tools are registered in config order, so when two servers expose the
+        # same tool name the last configured one wins regardless of timing
+        for tool_name, result in zip(started, results):
+            if isinstance(result, Exception):
+                self._log_init_failure(tool_name, result)
+            else:
+                self._register_tools(tool_name, started[tool_name], result)
+    
+    def _log_init_failure(self, tool_name: str, error: Exception):
+        """Log a server that failed to start; the workflow continues without it"""
+        logger.error(f"Failed to initialize {tool_name}: {error}")
+        logger.error("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+        logger.warning(f"Continuing without this tool...")
     
-    async def _start_server(self, tool_name: str, config: Dict[str, Any]):
+    async def _start_server(self, tool_name: str, config: Dict[str, Any]) -> ClientSession:
         """
         Start a single MCP server with proper context management.
         
         Args:
             tool_name: Name identifier for the tool
             config: Server configuration including command, args, and env
+            
+        Returns:
+            Entered client session, not yet initialized
         """
         logger.info(f"Starting {tool_name}...")
         
@@ -241,23 +271,45 @@ class MCPManager:
         # Create session using the transport
         session = ClientSession(read, write)
         await session.__aenter__()
+        return session
+    
+    async def _load_tools(self, session: ClientSession) -> List[types.Tool]:
+        """
+        Initialize a started server's session and list its tools.
+        
+        Args:
+            session: Session returned by _start_server
+            
+        Returns:
+            Tools the server provides
+        """
         await session.initialize()
         
         # List available tools
         tools_response = await session.list_tools()
+        return tools_response.tools
+    
+    def _register_tools(self, tool_name: str, session: ClientSession, tools: List[types.Tool]):
+        """
+        Register a server's session and tool schemas.
         
+        Args:
+            tool_name: Name identifier for the tool
+            session: Initialized session of the server
+            tools: Tools returned by _load_tools
+        """
         self.sessions[tool_name] = {'session': session}
         
         # Convert MCP tools to schemas
-        for tool in tools_response.tools:
+        for tool in tools:
             schema = self._mcp_tool_to_schema(tool)
             self.tool_schemas[tool.name] = {
                 'schema': schema,
                 'category': tool_name
             }
         
-        logger.info(f"{tool_name}: {len(tools_response.tools)} tools ready")
-        for tool in tools_response.tools:
+        logger.info(f"{tool_name}: {len(tools)} tools ready")
+        for tool in tools:
             logger.info(f"  • {tool.name}")
 
     
@@ -4,29 +4,26 @@ Provides file and directory operations for AI agents
 """
 
 import sys
-import os
-
-# Fix Windows asyncio/socket issue BEFORE any imports
-if sys.platform == 'win32':
-    # Set Windows specific environment variable to avoid Winsock issues
-    import socket
-    # Force use of selector event loop instead of proactor
-    os.environ.setdefault('PYTHONASYNCIODEBUG', '0')
-
 import asyncio
 
-# Set event loop policy for Windows
+# Fix Windows asyncio issues: use the selector event loop instead of proactor
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+import io
+import os
+import traceback
+
 from fastmcp import FastMCP
 from pathlib import Path
+from contextlib import redirect_stdout, redirect_stderr
 
 # Create FastMCP server instance
 server = FastMCP("Filesystem Tools")
 
 # Define workspace directory - use root workspace to avoid disturbing mcp_servers folder
-WORKSPACE_DIR = Path(__file__).parent.parent.parent / "workspace"
+# Resolved once at import so path validation does not repeat the realpath call
+WORKSPACE_DIR = (Path(__file__).parent.parent.parent / "workspace").resolve()
 WORKSPACE_DIR.mkdir(exist_ok=True)
 
 
@@ -34,14 +31,38 @@ def _validate_path(filepath: str) -> Path:
     """Validate that path is within workspace directory"""
     abs_path = (WORKSPACE_DIR / filepath).resolve()
     
-    if not str(abs_path).startswith(str(WORKSPACE_DIR.resolve())):
+    # is_relative_to compares path components, so a sibling such as
+    # "workspace-evil" does not pass as a plain string prefix would
+    if not abs_path.is_relative_to(WORKSPACE_DIR):
         raise ValueError(f"Access denied: path must be within workspace directory")
     
     return abs_path
 
 
+def _write_file(abs_path: Path, content: str) -> None:
+    """Write a file, creating parent directories as needed (blocking)"""
+    abs_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(abs_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _list_entries(abs_path: Path) -> list[str]:
+    """Format one line per directory entry (blocking)"""
+    # os.scandir caches file type and stat per entry, avoiding repeated stat calls
+    items = []
+    with os.scandir(abs_path) as entries:
+        for entry in entries:
+            item_type = "DIR " if entry.is_dir() else "FILE"
+            size = f"{entry.stat().st_size:>10} bytes" if entry.is_file() else ""
+            items.append(f"  {item_type} {entry.name:30} {size}")
+    return items
+
+
+# Disk I/O in the tools below runs in a worker thread via asyncio.to_thread,
+# so a slow read or write does not stall other requests on the event loop.
+
 @server.tool()
-def create_file(filepath: str, content: str) -> str:
+async def create_file(filepath: str, content: str) -> str:
     """
     Create a new file with the given content
     
@@ -54,10 +75,7 @@ def create_file(filepath: str, content: str) -> str:
     """
     try:
         abs_path = _validate_path(filepath)
-        abs_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(abs_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        await asyncio.to_thread(_write_file, abs_path, content)
         
         return f"✓ File created successfully: {filepath}"
     except Exception as e:
@@ -65,7 +83,7 @@ def create_file(filepath: str, content: str) -> str:
 
 
 @server.tool()
-def read_file(filepath: str) -> str:
+async def read_file(filepath: str) -> str:
     """
     Read the contents of a file
     
@@ -81,8 +99,7 @@ def read_file(filepath: str) -> str:
         if not abs_path.exists():
             return f"✗ File not found: {filepath}"
         
-        with open(abs_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = await asyncio.to_thread(abs_path.read_text, encoding='utf-8')
         
         return content
     except Exception as e:
@@ -90,7 +107,7 @@ def read_file(filepath: str) -> str:
 
 
 @server.tool()
-def list_directory(dirpath: str = ".") -> str:
+async def list_directory(dirpath: str = ".") -> str:
     """
     List contents of a directory
     
@@ -109,11 +126,7 @@ def list_directory(dirpath: str = ".") -> str:
         if not abs_path.is_dir():
             return f"✗ Not a directory: {dirpath}"
         
-        items = []
-        for item in abs_path.iterdir():
-            item_type = "DIR " if item.is_dir() else "FILE"
-            size = f"{item.stat().st_size:>10} bytes" if item.is_file() else ""
-            items.append(f"  {item_type} {item.name:30} {size}")
+        items = await asyncio.to_thread(_list_entries, abs_path)
         
         if not items:
             return f"Directory is empty: {dirpath}"
@@ -180,11 +193,6 @@ def execute_python(code: str) -> str:
     Returns:
         Output from the code execution (stdout, stderr, or return value)
     """
-    import io
-    import sys
-    import traceback
-    from contextlib import redirect_stdout, redirect_stderr
-    
     try:
         # Capture stdout and stderr
         stdout_capture = io.StringIO()
@@ -200,7 +208,7 @@ def execute_python(code: str) -> str:
                 exec(compiled_code, namespace)
             except Exception as e:
                 # Capture execution errors
-                traceback.print_exc()
+                traceback.print_exception(type(e), e, e.__traceback__)
         
         # Get output
         stdout_value = stdout_capture.getvalue()
@@ -3,17 +3,25 @@ MCP Server Launcher Wrapper
 Spawns a fresh Python process to avoid Windows asyncio inheritance issues
 """
 
+import os
 import sys
 import subprocess
 
+SERVER_ARGS = [sys.executable, "-u", "engine/mcp_servers/simple_mcp_server.py"]
+
 if __name__ == "__main__":
+    if sys.platform != 'win32':
+        # Replace this process with the server: no fork, no idle parent
+        # interpreter, and stdio is inherited as-is
+        os.execv(sys.executable, SERVER_ARGS)
+
     # Launch server in a completely fresh Python process
     # This avoids inheriting the parent's asyncio state
     result = subprocess.run(
-        [sys.executable, "-u", "engine/mcp_servers/simple_mcp_server.py"],
+        SERVER_ARGS,
         stdin=sys.stdin,
         stdout=sys.stdout,
         stderr=sys.stderr,
-        creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform == 'win32' else 0
+        creationflags=subprocess.CREATE_NEW_CONSOLE
     )
     sys.exit(result.returncode)
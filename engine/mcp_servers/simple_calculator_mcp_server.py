@@ -4,24 +4,15 @@ Provides mathematical calculation tools via MCP protocol
 """
 
 import sys
-import os
-
-# Fix Windows asyncio issues FIRST
-if sys.platform == 'win32':
-    for mod in list(sys.modules.keys()):
-        if 'asyncio' in mod or 'selectors' in mod or '_overlapped' in mod:
-            del sys.modules[mod]
-    os.environ['PYTHONASYNCIODEBUG'] = '0'
-
 import asyncio
 
+# Fix Windows asyncio issues: use the selector event loop instead of proactor
 if sys.platform == 'win32':
-    try:
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    except:
-        pass
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 import math
+from typing import Callable
+import numpy as np
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 import mcp.types as types
@@ -174,93 +165,77 @@ async def list_tools() -> list[types.Tool]:
     ]
 
 
+def _add(arguments: dict) -> str:
+    return f"{arguments['a']} + {arguments['b']} = {arguments['a'] + arguments['b']}"
+
+
+def _subtract(arguments: dict) -> str:
+    return f"{arguments['a']} - {arguments['b']} = {arguments['a'] - arguments['b']}"
+
+
+def _multiply(arguments: dict) -> str:
+    return f"{arguments['a']} × {arguments['b']} = {arguments['a'] * arguments['b']}"
+
+
+def _divide(arguments: dict) -> str:
+    if arguments["b"] == 0:
+        return "✗ Error: Division by zero"
+    return f"{arguments['a']} ÷ {arguments['b']} = {arguments['a'] / arguments['b']}"
+
+
+def _power(arguments: dict) -> str:
+    result = arguments["base"] ** arguments["exponent"]
+    return f"{arguments['base']}^{arguments['exponent']} = {result}"
+
+
+def _sqrt(arguments: dict) -> str:
+    if arguments["n"] < 0:
+        return "✗ Error: Cannot calculate square root of negative number"
+    return f"√{arguments['n']} = {math.sqrt(arguments['n'])}"
+
+
+def _percentage(arguments: dict) -> str:
+    result = (arguments["value"] * arguments["percent"]) / 100
+    return f"{arguments['percent']}% of {arguments['value']} = {result}"
+
+
+def _average(arguments: dict) -> str:
+    numbers = arguments["numbers"]
+    if not numbers:
+        return "✗ Error: Cannot calculate average of empty list"
+    result = float(np.mean(np.asarray(numbers, dtype=np.float64)))
+    return f"Average of {numbers} = {result}"
+
+
+# Tool name -> handler formatting the result text, looked up once per call
+_TOOLS: dict[str, Callable[[dict], str]] = {
+    "add": _add,
+    "subtract": _subtract,
+    "multiply": _multiply,
+    "divide": _divide,
+    "power": _power,
+    "sqrt": _sqrt,
+    "percentage": _percentage,
+    "average": _average,
+}
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
     """Execute calculator tool calls"""
-    try:
-        if name == "add":
-            result = arguments["a"] + arguments["b"]
-            return [types.TextContent(
-                type="text",
-                text=f"{arguments['a']} + {arguments['b']} = {result}"
-            )]
-        
-        elif name == "subtract":
-            result = arguments["a"] - arguments["b"]
-            return [types.TextContent(
-                type="text",
-                text=f"{arguments['a']} - {arguments['b']} = {result}"
-            )]
-        
-        elif name == "multiply":
-            result = arguments["a"] * arguments["b"]
-            return [types.TextContent(
-                type="text",
-                text=f"{arguments['a']} × {arguments['b']} = {result}"
-            )]
-        
-        elif name == "divide":
-            if arguments["b"] == 0:
-                return [types.TextContent(
-                    type="text",
-                    text="✗ Error: Division by zero"
-                )]
-            result = arguments["a"] / arguments["b"]
-            return [types.TextContent(
-                type="text",
-                text=f"{arguments['a']} ÷ {arguments['b']} = {result}"
-            )]
-        
-        elif name == "power":
-            result = arguments["base"] ** arguments["exponent"]
-            return [types.TextContent(
-                type="text",
-                text=f"{arguments['base']}^{arguments['exponent']} = {result}"
-            )]
-        
-        elif name == "sqrt":
-            if arguments["n"] < 0:
-                return [types.TextContent(
-                    type="text",
-                    text="✗ Error: Cannot calculate square root of negative number"
-                )]
-            result = math.sqrt(arguments["n"])
-            return [types.TextContent(
-                type="text",
-                text=f"√{arguments['n']} = {result}"
-            )]
-        
-        elif name == "percentage":
-            result = (arguments["value"] * arguments["percent"]) / 100
-            return [types.TextContent(
-                type="text",
-                text=f"{arguments['percent']}% of {arguments['value']} = {result}"
-            )]
-        
-        elif name == "average":
-            numbers = arguments["numbers"]
-            if not numbers:
-                return [types.TextContent(
-                    type="text",
-                    text="✗ Error: Cannot calculate average of empty list"
-                )]
-            result = sum(numbers) / len(numbers)
-            return [types.TextContent(
-                type="text",
-                text=f"Average of {numbers} = {result}"
-            )]
-        
-        else:
-            return [types.TextContent(
-                type="text",
-                text=f"✗ Unknown tool: {name}"
-            )]
-    
-    except Exception as e:
+    handler = _TOOLS.get(name)
+    if handler is None:
         return [types.TextContent(
             type="text",
-            text=f"✗ Error: {str(e)}"
+            text=f"✗ Unknown tool: {name}"
         )]
+    
+    try:
+        text = handler(arguments)
+    except Exception as e:
+        text = f"✗ Error: {str(e)}"
+    
+    return [types.TextContent(type="text", text=text)]
 
 
 async def main():
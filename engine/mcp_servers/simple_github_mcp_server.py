@@ -5,28 +5,37 @@ Provides GitHub repository tools via MCP protocol
 
 import sys
 import os
-
-# Fix Windows asyncio issues FIRST
-if sys.platform == 'win32':
-    for mod in list(sys.modules.keys()):
-        if 'asyncio' in mod or 'selectors' in mod or '_overlapped' in mod:
-            del sys.modules[mod]
-    os.environ['PYTHONASYNCIODEBUG'] = '0'
-
 import asyncio
+import codecs
+import io
+import json
+import time
 
+# Fix Windows asyncio issues: use the selector event loop instead of proactor
 if sys.platform == 'win32':
-    try:
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    except:
-        pass
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-import requests
-from typing import Optional
+from collections import OrderedDict
+from contextvars import ContextVar
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 import mcp.types as types
 
+# aiohttp is imported on the first GitHub request rather than here, so
+# starting the server and answering list_tools does not pay for it
+if TYPE_CHECKING:
+    import aiohttp
+
+# Optional: orjson decodes GitHub's JSON payloads several times faster than the stdlib
+_json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # GitHub API configuration
 GITHUB_API_BASE = "https://api.github.com"
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
@@ -34,177 +43,384 @@ GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 if not GITHUB_TOKEN:
     print("Warning: GITHUB_TOKEN not found in environment. Some operations may be limited.", file=sys.stderr)
 
+# Headers for GitHub API requests (GITHUB_TOKEN is read once, so these never change)
+_HEADERS = {
+    "Accept": "application/vnd.github.v3+json",
+    "User-Agent": "YML-Agentic-Orchestrator-MCP"
+}
+if GITHUB_TOKEN:
+    _HEADERS["Authorization"] = f"token {GITHUB_TOKEN}"
+
+# Per-request timeout in seconds
+REQUEST_TIMEOUT = 10
+
+# Media type that makes the contents endpoint return file bytes instead of
+# a JSON envelope with base64-encoded content
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+# Default cap on how much of a file read_file_content downloads
+MAX_FILE_BYTES = 256 * 1024
+
+# Time a tool call may spend per GitHub request it makes, including that
+# request's retry and body read; tools making several sequential requests
+# are allowed a multiple of it (see _TOOLS). Retry-After waits do not count
+# against it.
+TOOL_TIMEOUT = 15
+
+# Backpressure: at most this many tool calls talk to GitHub at once, so a
+# burst of calls does not trip the secondary rate limit
+MAX_CONCURRENT_CALLS = 10
+_CALL_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+
+# A rate-limited GET (429, or 403 with Retry-After) is retried once if
+# GitHub asks to wait no longer than this many seconds (its secondary rate
+# limit usually asks for 60)
+MAX_RETRY_AFTER = 60
+
+# Retry-After seconds waited by the current tool call; call_tool pushes its
+# deadline back by them
+_BACKOFF: ContextVar[Optional[list[float]]] = ContextVar("_BACKOFF", default=None)
+
+# Response cache for GET requests: repeat calls within CACHE_TTL seconds skip
+# the network, and later ones revalidate with If-None-Match (a 304 does not
+# count against the rate limit)
+CACHE_TTL = 60
+CACHE_SIZE = 512
+_CACHE: "OrderedDict[tuple[Any, ...], tuple[float, Optional[str], Any]]" = OrderedDict()
+
+# Shared HTTP session, opened on first use and closed when main() exits
+_SESSION: Optional["aiohttp.ClientSession"] = None
+# The aiohttp module, bound by _get_session so request errors can be caught
+# without importing it again on every call
+_AIOHTTP: Any = None
 
-def _get_headers() -> dict:
-    """Get headers for GitHub API requests"""
-    headers = {
-        "Accept": "application/vnd.github.v3+json",
-        "User-Agent": "YML-Agentic-Orchestrator-MCP"
-    }
-    if GITHUB_TOKEN:
-        headers["Authorization"] = f"token {GITHUB_TOKEN}"
-    return headers
+
+class GitHubAPIError(Exception):
+    """A failed GitHub request; status is None for network errors and timeouts"""
+    
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _get_session() -> "aiohttp.ClientSession":
+    """Return the shared HTTP session, importing aiohttp and opening it on first use"""
+    global _SESSION, _AIOHTTP
+    if _SESSION is None:
+        import aiohttp
+        _AIOHTTP = aiohttp
+        # Headers are static, so they are set once here rather than per request,
+        # and the pooled connector keeps TLS connections to GitHub alive between
+        # calls (sized to match the number of concurrent tool calls)
+        _SESSION = aiohttp.ClientSession(
+            headers=_HEADERS,
+            connector=aiohttp.TCPConnector(limit=MAX_CONCURRENT_CALLS, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        )
+    return _SESSION
+
+
+async def _github_get(
+    url: str,
+    params: Optional[dict[str, Any]] = None,
+    accept: Optional[str] = None,
+    max_bytes: Optional[int] = None
+) -> Any:
+    """
+    GET a GitHub API URL using the response cache
+    
+    JSON responses are returned decoded; any other body (e.g. a file
+    requested with RAW_MEDIA_TYPE) is returned as bytes. With max_bytes,
+    a non-JSON body is streamed and cut at max_bytes + 1 bytes, so a
+    result longer than max_bytes means the body was truncated.
+    Failures are raised as GitHubAPIError.
+    """
+    key = (url, tuple(sorted(params.items())) if params else (), accept, max_bytes)
+    cached = _CACHE.get(key)
+    if cached and time.monotonic() < cached[0]:
+        return cached[2]
+    
+    headers: dict[str, str] = {}
+    if accept:
+        headers["Accept"] = accept
+    if cached and cached[1]:
+        headers["If-None-Match"] = cached[1]
+    # Opened before the try, so aiohttp is bound when the handlers below run
+    session = _get_session()
+    try:
+        for attempt in range(2):
+            async with session.get(url, params=params, headers=headers) as response:
+                delay = _retry_delay(response) if attempt == 0 else None
+                if delay is None:
+                    if response.status == 304 and cached:
+                        data = cached[2]
+                    else:
+                        response.raise_for_status()
+                        if response.content_type == "application/json":
+                            data = _json_loads(await response.read())
+                        elif max_bytes is not None:
+                            data = await _read_limited(response, max_bytes + 1)
+                        else:
+                            data = await response.read()
+                    etag = response.headers.get("ETag") or (cached[1] if cached else None)
+            if delay is None:
+                break
+            backoff = _BACKOFF.get()
+            if backoff is not None:
+                backoff.append(delay)
+            await asyncio.sleep(delay)
+    except _AIOHTTP.ClientResponseError as e:
+        raise GitHubAPIError(str(e), e.status) from e
+    except (_AIOHTTP.ClientError, asyncio.TimeoutError) as e:
+        raise GitHubAPIError(str(e)) from e
+    
+    _CACHE[key] = (time.monotonic() + CACHE_TTL, etag, data)
+    _CACHE.move_to_end(key)
+    if len(_CACHE) > CACHE_SIZE:
+        _CACHE.popitem(last=False)
+    return data
+
+
+async def _github_post(url: str, payload: dict[str, Any]) -> Any:
+    """POST JSON to a GitHub API URL and return the decoded response (never cached or retried)"""
+    session = _get_session()
+    try:
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+            return _json_loads(await response.read())
+    except _AIOHTTP.ClientResponseError as e:
+        raise GitHubAPIError(str(e), e.status) from e
+    except (_AIOHTTP.ClientError, asyncio.TimeoutError) as e:
+        raise GitHubAPIError(str(e)) from e
+
+
+def _retry_delay(response: "aiohttp.ClientResponse") -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited response, or None to not retry"""
+    if response.status not in (403, 429):
+        return None
+    try:
+        delay = float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+    return delay if 0 <= delay <= MAX_RETRY_AFTER else None
+
+
+async def _run_with_budget(
+    call: Awaitable[list[types.TextContent]],
+    timeout: float,
+    backoff: list[float]
+) -> list[types.TextContent]:
+    """
+    Await a tool call, raising asyncio.TimeoutError after timeout seconds
+    
+    Seconds appended to backoff (Retry-After waits) extend the deadline, so
+    only time spent on GitHub requests counts against the timeout.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(call)
+    deadline = loop.time() + timeout
+    try:
+        while not task.done():
+            remaining = deadline + sum(backoff) - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            await asyncio.wait({task}, timeout=remaining)
+    finally:
+        task.cancel()
+    return task.result()
+
+
+async def _read_limited(response: "aiohttp.ClientResponse", limit: int) -> bytes:
+    """Read at most limit bytes of a response body, stopping the download there"""
+    chunks: list[bytes] = []
+    total = 0
+    async for chunk in response.content.iter_chunked(16384):
+        chunks.append(chunk)
+        total += len(chunk)
+        if total >= limit:
+            break
+    return b"".join(chunks)[:limit]
 
 
 # Create MCP server
 app = Server("github-tools")
 
 
-@app.list_tools()
-async def list_tools() -> list[types.Tool]:
-    """List available GitHub tools"""
-    return [
-        types.Tool(
-            name="search_repositories",
-            description="Search for GitHub repositories by query string",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query (e.g., 'machine learning', 'user:username', 'org:organization')"
-                    },
-                    "max_results": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return (default: 10)",
-                        "default": 10
-                    }
+# Tool definitions are static, so they are built once and the same list is
+# returned for every list_tools request
+_TOOL_LIST = [
+    types.Tool(
+        name="search_repositories",
+        description="Search for GitHub repositories by query string",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query (e.g., 'machine learning', 'user:username', 'org:organization')"
                 },
-                "required": ["query"]
-            }
-        ),
-        types.Tool(
-            name="list_repository_files",
-            description="List all files in a GitHub repository at a specific path",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner (username or organization)"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "path": {
-                        "type": "string",
-                        "description": "Path in repository (default: root '/')",
-                        "default": ""
-                    },
-                    "branch": {
-                        "type": "string",
-                        "description": "Branch name (default: repository's default branch)",
-                        "default": ""
-                    }
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return (default: 10)",
+                    "default": 10
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    types.Tool(
+        name="list_repository_files",
+        description="List all files in a GitHub repository at a specific path",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner (username or organization)"
                 },
-                "required": ["owner", "repo"]
-            }
-        ),
-        types.Tool(
-            name="read_file_content",
-            description="Read the contents of a file from a GitHub repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner (username or organization)"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "filepath": {
-                        "type": "string",
-                        "description": "Path to the file in the repository"
-                    },
-                    "branch": {
-                        "type": "string",
-                        "description": "Branch name (default: repository's default branch)",
-                        "default": ""
-                    }
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
                 },
-                "required": ["owner", "repo", "filepath"]
-            }
-        ),
-        types.Tool(
-            name="create_issue",
-            description="Create a new issue in a GitHub repository",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "owner": {
-                        "type": "string",
-                        "description": "Repository owner (username or organization)"
-                    },
-                    "repo": {
-                        "type": "string",
-                        "description": "Repository name"
-                    },
-                    "title": {
-                        "type": "string",
-                        "description": "Issue title"
-                    },
-                    "body": {
-                        "type": "string",
-                        "description": "Issue description/body",
-                        "default": ""
-                    },
-                    "labels": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Labels to apply to the issue",
-                        "default": []
-                    }
+                "path": {
+                    "type": "string",
+                    "description": "Path in repository (default: root '/')",
+                    "default": ""
                 },
-                "required": ["owner", "repo", "title"]
-            }
-        )
-    ]
+                "branch": {
+                    "type": "string",
+                    "description": "Branch name (default: repository's default branch)",
+                    "default": ""
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    types.Tool(
+        name="list_repository_tree",
+        description="List every file in a GitHub repository in a single request, grouped by directory (use list_repository_files for a single directory)",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner (username or organization)"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "branch": {
+                    "type": "string",
+                    "description": "Branch name (default: repository's default branch)",
+                    "default": ""
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    types.Tool(
+        name="read_file_content",
+        description="Read the contents of a file from a GitHub repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner (username or organization)"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "filepath": {
+                    "type": "string",
+                    "description": "Path to the file in the repository"
+                },
+                "branch": {
+                    "type": "string",
+                    "description": "Branch name (default: repository's default branch)",
+                    "default": ""
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "description": f"Maximum number of bytes to read; larger files are truncated (default: {MAX_FILE_BYTES})",
+                    "default": MAX_FILE_BYTES,
+                    "minimum": 1
+                }
+            },
+            "required": ["owner", "repo", "filepath"]
+        }
+    ),
+    types.Tool(
+        name="create_issue",
+        description="Create a new issue in a GitHub repository",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "Repository owner (username or organization)"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "Repository name"
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Issue title"
+                },
+                "body": {
+                    "type": "string",
+                    "description": "Issue description/body",
+                    "default": ""
+                },
+                "labels": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Labels to apply to the issue",
+                    "default": []
+                }
+            },
+            "required": ["owner", "repo", "title"]
+        }
+    )
+]
+
+
+@app.list_tools()
+async def list_tools() -> list[types.Tool]:
+    """List available GitHub tools"""
+    return _TOOL_LIST
 
 
 @app.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
+async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent]:
     """Execute GitHub tool calls"""
+    tool = _TOOLS.get(name)
+    if tool is None:
+        return [types.TextContent(
+            type="text",
+            text=f"✗ Unknown tool: {name}"
+        )]
+    
+    handler, keys, requests = tool
+    timeout = requests * TOOL_TIMEOUT
     try:
-        if name == "search_repositories":
-            return await search_repositories(
-                query=arguments["query"],
-                max_results=arguments.get("max_results", 10)
-            )
-        
-        elif name == "list_repository_files":
-            return await list_repository_files(
-                owner=arguments["owner"],
-                repo=arguments["repo"],
-                path=arguments.get("path", ""),
-                branch=arguments.get("branch", "")
-            )
-        
-        elif name == "read_file_content":
-            return await read_file_content(
-                owner=arguments["owner"],
-                repo=arguments["repo"],
-                filepath=arguments["filepath"],
-                branch=arguments.get("branch", "")
-            )
-        
-        elif name == "create_issue":
-            return await create_issue(
-                owner=arguments["owner"],
-                repo=arguments["repo"],
-                title=arguments["title"],
-                body=arguments.get("body", ""),
-                labels=arguments.get("labels", [])
-            )
-        
-        else:
-            return [types.TextContent(
-                type="text",
-                text=f"✗ Unknown tool: {name}"
-            )]
+        # Omitted optional arguments fall back to the handler's own defaults
+        kwargs = {key: arguments[key] for key in keys if key in arguments}
+        # The handler's task inherits this list through its context copy
+        backoff: list[float] = []
+        _BACKOFF.set(backoff)
+        # The timeout starts once a slot is free, so queued calls are not cut short
+        async with _CALL_SEMAPHORE:
+            return await _run_with_budget(handler(**kwargs), timeout, backoff)
     
+    except asyncio.TimeoutError:
+        return [types.TextContent(
+            type="text",
+            text=f"✗ Tool timed out after {timeout}s: {name}"
+        )]
     except Exception as e:
         return [types.TextContent(
             type="text",
@@ -223,10 +439,8 @@ async def search_repositories(query: str, max_results: int = 10) -> list[types.T
             "order": "desc"
         }
         
-        response = requests.get(url, headers=_get_headers(), params=params, timeout=10)
-        response.raise_for_status()
+        data = await _github_get(url, params)
         
-        data = response.json()
         repos = data.get("items", [])
         
         if not repos:
@@ -235,11 +449,13 @@ async def search_repositories(query: str, max_results: int = 10) -> list[types.T
                 text=f"No repositories found for query: {query}"
             )]
         
-        result_lines = [f"Found {data.get('total_count', 0)} repositories (showing top {len(repos)}):\n"]
+        # Written straight into one buffer instead of a list joined at the end
+        buf = io.StringIO()
+        buf.write(f"Found {data.get('total_count', 0)} repositories (showing top {len(repos)}):\n")
         
         for repo in repos[:max_results]:
-            result_lines.append(
-                f"📦 {repo['full_name']}\n"
+            buf.write(
+                f"\n📦 {repo['full_name']}\n"
                 f"   ⭐ {repo['stargazers_count']} stars | "
                 f"🍴 {repo['forks_count']} forks\n"
                 f"   📝 {repo.get('description', 'No description')}\n"
@@ -248,10 +464,10 @@ async def search_repositories(query: str, max_results: int = 10) -> list[types.T
         
         return [types.TextContent(
             type="text",
-            text="\n".join(result_lines)
+            text=buf.getvalue()
         )]
     
-    except requests.exceptions.RequestException as e:
+    except GitHubAPIError as e:
         return [types.TextContent(
             type="text",
             text=f"✗ GitHub API error: {str(e)}"
@@ -262,14 +478,11 @@ async def list_repository_files(owner: str, repo: str, path: str = "", branch: s
     """List files in a GitHub repository"""
     try:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}"
-        params = {}
+        params: dict[str, str] = {}
         if branch:
             params["ref"] = branch
         
-        response = requests.get(url, headers=_get_headers(), params=params, timeout=10)
-        response.raise_for_status()
-        
-        contents = response.json()
+        contents = await _github_get(url, params)
         
         # Handle single file response
         if isinstance(contents, dict):
@@ -284,69 +497,131 @@ async def list_repository_files(owner: str, repo: str, path: str = "", branch: s
                 text=f"No files found in {owner}/{repo}/{path}"
             )]
         
-        result_lines = [f"📁 {owner}/{repo}/{path or '(root)'}\n"]
-        
-        # Separate directories and files
-        dirs = [item for item in contents if item['type'] == 'dir']
-        files = [item for item in contents if item['type'] == 'file']
-        
-        # List directories first
-        for item in sorted(dirs, key=lambda x: x['name']):
-            result_lines.append(f"📂 {item['name']}/")
-        
-        # Then list files
-        for item in sorted(files, key=lambda x: x['name']):
-            size_kb = item.get('size', 0) / 1024
-            result_lines.append(f"📄 {item['name']} ({size_kb:.1f} KB)")
-        
-        result_lines.append(f"\nTotal: {len(dirs)} directories, {len(files)} files")
+        buf = io.StringIO()
+        buf.write(f"📁 {owner}/{repo}/{path or '(root)'}\n")
+        
+        # One sort and one pass: directories are written as they are seen,
+        # file lines go to a second buffer so they follow the directories
+        file_buf = io.StringIO()
+        dir_count = 0
+        file_count = 0
+        for item in sorted(contents, key=itemgetter('name')):
+            if item['type'] == 'dir':
+                buf.write(f"\n📂 {item['name']}/")
+                dir_count += 1
+            elif item['type'] == 'file':
+                size_kb = item.get('size', 0) / 1024
+                file_buf.write(f"\n📄 {item['name']} ({size_kb:.1f} KB)")
+                file_count += 1
+        buf.write(file_buf.getvalue())
+        
+        buf.write(f"\n\nTotal: {dir_count} directories, {file_count} files")
         
         return [types.TextContent(
             type="text",
-            text="\n".join(result_lines)
+            text=buf.getvalue()
         )]
     
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
+    except GitHubAPIError as e:
+        if e.status == 404:
             return [types.TextContent(
                 type="text",
                 text=f"✗ Repository or path not found: {owner}/{repo}/{path}"
             )]
-        raise
-    except requests.exceptions.RequestException as e:
         return [types.TextContent(
             type="text",
             text=f"✗ GitHub API error: {str(e)}"
         )]
 
 
-async def read_file_content(owner: str, repo: str, filepath: str, branch: str = "") -> list[types.TextContent]:
+async def list_repository_tree(owner: str, repo: str, branch: str = "") -> list[types.TextContent]:
+    """List the whole file tree of a GitHub repository with the Git Trees API"""
+    try:
+        repo_url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
+        if not branch:
+            branch = (await _github_get(repo_url))["default_branch"]
+        
+        # The tree is fetched by commit SHA, so its cache entry stays valid
+        # for as long as the branch does not move
+        commit_sha = (await _github_get(f"{repo_url}/branches/{branch}"))["commit"]["sha"]
+        data = await _github_get(f"{repo_url}/git/trees/{commit_sha}", {"recursive": "1"})
+        
+        # Group files under their parent directory ("" is the repository root)
+        groups: dict[str, list[tuple[str, int]]] = {"": []}
+        file_count = 0
+        for item in data.get("tree", []):
+            if item['type'] == 'tree':
+                groups.setdefault(item['path'], [])
+            elif item['type'] == 'blob':
+                parent, _, name = item['path'].rpartition('/')
+                groups.setdefault(parent, []).append((name, item.get('size', 0)))
+                file_count += 1
+        
+        buf = io.StringIO()
+        buf.write(f"🌳 {owner}/{repo} @ {branch}\n")
+        for directory in sorted(groups):
+            buf.write(f"\n📂 {directory + '/' if directory else '(root)'}\n")
+            for name, size in sorted(groups[directory]):
+                buf.write(f"   📄 {name} ({size / 1024:.1f} KB)\n")
+        
+        buf.write(f"\nTotal: {len(groups) - 1} directories, {file_count} files")
+        if data.get("truncated"):
+            buf.write("\n⚠ GitHub truncated this tree; use list_repository_files for the missing directories")
+        
+        return [types.TextContent(
+            type="text",
+            text=buf.getvalue()
+        )]
+    
+    except GitHubAPIError as e:
+        if e.status == 404:
+            return [types.TextContent(
+                type="text",
+                text=f"✗ Repository or branch not found: {owner}/{repo}@{branch}"
+            )]
+        return [types.TextContent(
+            type="text",
+            text=f"✗ GitHub API error: {str(e)}"
+        )]
+
+
+async def read_file_content(owner: str, repo: str, filepath: str, branch: str = "", max_bytes: int = MAX_FILE_BYTES) -> list[types.TextContent]:
     """Read file content from a GitHub repository"""
+    if max_bytes < 1:
+        return [types.TextContent(
+            type="text",
+            text=f"✗ max_bytes must be at least 1, got {max_bytes}"
+        )]
+    
     try:
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{filepath}"
-        params = {}
+        params: dict[str, str] = {}
         if branch:
             params["ref"] = branch
         
-        response = requests.get(url, headers=_get_headers(), params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        # Raw media type: file bytes come back directly, no base64 envelope
+        data = await _github_get(url, params, accept=RAW_MEDIA_TYPE, max_bytes=max_bytes)
         
-        # Check if it's a file
-        if data.get('type') != 'file':
+        # Anything other than a file (e.g. a directory listing) is still returned as JSON
+        if not isinstance(data, bytes):
             return [types.TextContent(
                 type="text",
                 text=f"✗ '{filepath}' is not a file"
             )]
         
-        # Decode content (GitHub returns base64 encoded content)
-        import base64
-        content = base64.b64decode(data['content']).decode('utf-8')
+        truncated = len(data) > max_bytes
+        # final=False drops a multi-byte character cut off at the limit while
+        # still rejecting binary content
+        content = codecs.getincrementaldecoder('utf-8')().decode(data[:max_bytes], final=not truncated)
+        if truncated:
+            size_line = f"Size: over {max_bytes} bytes (showing the first {max_bytes})"
+            content += "\n… (truncated)"
+        else:
+            size_line = f"Size: {len(data)} bytes"
         
         result = (
             f"📄 {owner}/{repo}/{filepath}\n"
-            f"Size: {data.get('size', 0)} bytes\n"
+            f"{size_line}\n"
             f"{'='*60}\n"
             f"{content}\n"
             f"{'='*60}"
@@ -362,21 +637,19 @@ async def read_file_content(owner: str, repo: str, filepath: str, branch: str =
             type="text",
             text=f"✗ File is binary or cannot be decoded as UTF-8"
         )]
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
+    except GitHubAPIError as e:
+        if e.status == 404:
             return [types.TextContent(
                 type="text",
                 text=f"✗ File not found: {owner}/{repo}/{filepath}"
             )]
-        raise
-    except requests.exceptions.RequestException as e:
         return [types.TextContent(
             type="text",
             text=f"✗ GitHub API error: {str(e)}"
         )]
 
 
-async def create_issue(owner: str, repo: str, title: str, body: str = "", labels: list = None) -> list[types.TextContent]:
+async def create_issue(owner: str, repo: str, title: str, body: str = "", labels: Optional[list[str]] = None) -> list[types.TextContent]:
     """Create a new issue in a GitHub repository"""
     try:
         if not GITHUB_TOKEN:
@@ -387,7 +660,7 @@ async def create_issue(owner: str, repo: str, title: str, body: str = "", labels
         
         url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues"
         
-        payload = {
+        payload: dict[str, Any] = {
             "title": title,
             "body": body
         }
@@ -395,10 +668,7 @@ async def create_issue(owner: str, repo: str, title: str, body: str = "", labels
         if labels:
             payload["labels"] = labels
         
-        response = requests.post(url, headers=_get_headers(), json=payload, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = await _github_post(url, payload)
         
         result = (
             f"✓ Issue created successfully!\n"
@@ -415,38 +685,52 @@ async def create_issue(owner: str, repo: str, title: str, body: str = "", labels
             text=result
         )]
     
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
+    except GitHubAPIError as e:
+        if e.status == 404:
             return [types.TextContent(
                 type="text",
                 text=f"✗ Repository not found: {owner}/{repo}"
             )]
-        elif e.response.status_code == 401:
+        elif e.status == 401:
             return [types.TextContent(
                 type="text",
                 text="✗ Authentication failed. Check your GITHUB_TOKEN."
             )]
-        elif e.response.status_code == 403:
+        elif e.status == 403:
             return [types.TextContent(
                 type="text",
                 text="✗ Forbidden. You may not have permission to create issues in this repository."
             )]
-        raise
-    except requests.exceptions.RequestException as e:
         return [types.TextContent(
             type="text",
             text=f"✗ GitHub API error: {str(e)}"
         )]
 
 
-async def main():
+# Tool name -> (handler, argument names it accepts, sequential GitHub requests
+# it makes at most, which scales its timeout)
+_TOOLS: dict[str, tuple[Callable[..., Awaitable[list[types.TextContent]]], tuple[str, ...], int]] = {
+    "search_repositories": (search_repositories, ("query", "max_results"), 1),
+    "list_repository_files": (list_repository_files, ("owner", "repo", "path", "branch"), 1),
+    "list_repository_tree": (list_repository_tree, ("owner", "repo", "branch"), 3),
+    "read_file_content": (read_file_content, ("owner", "repo", "filepath", "branch", "max_bytes"), 1),
+    "create_issue": (create_issue, ("owner", "repo", "title", "body", "labels"), 1),
+}
+
+
+async def main() -> None:
     """Run the MCP server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        # Close the HTTP session if any tool call opened one
+        if _SESSION is not None:
+            await _SESSION.close()
 
 
 if __name__ == "__main__":
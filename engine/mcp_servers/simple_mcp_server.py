@@ -4,29 +4,14 @@ Provides filesystem and Python execution tools
 """
 
 import sys
-
-# Fix Windows asyncio issues FIRST before any other imports
-if sys.platform == 'win32':
-    # Force clean import of asyncio by removing any cached modules
-    for mod in list(sys.modules.keys()):
-        if 'asyncio' in mod or 'selectors' in mod or '_overlapped' in mod:
-            del sys.modules[mod]
-    
-    # Set environment to use selector event loop
-    import os
-    os.environ['PYTHONASYNCIODEBUG'] = '0'
-
-# Now safe to import asyncio
 import asyncio
 
-# Set Windows event loop policy after import
+# Fix Windows asyncio issues: use the selector event loop instead of proactor
 if sys.platform == 'win32':
-    try:
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    except:
-        pass  # If selector policy doesn't exist, use default
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 import io
+import os
 import traceback
 from pathlib import Path
 from contextlib import redirect_stdout, redirect_stderr
@@ -36,18 +21,39 @@ from mcp.server.stdio import stdio_server
 import mcp.types as types
 
 # Workspace directory - use root workspace to avoid disturbing mcp_servers folder
-WORKSPACE_DIR = Path(__file__).parent.parent.parent / "workspace"
+# Resolved once at import so path validation does not repeat the realpath call
+WORKSPACE_DIR = (Path(__file__).parent.parent.parent / "workspace").resolve()
 WORKSPACE_DIR.mkdir(exist_ok=True)
 
 
 def _validate_path(filepath: str) -> Path:
     """Validate that path is within workspace directory"""
     abs_path = (WORKSPACE_DIR / filepath).resolve()
-    if not str(abs_path).startswith(str(WORKSPACE_DIR.resolve())):
+    # is_relative_to compares path components, unlike a string prefix check
+    if not abs_path.is_relative_to(WORKSPACE_DIR):
         raise ValueError(f"Access denied: path must be within workspace directory")
     return abs_path
 
 
+def _write_file(abs_path: Path, content: str) -> None:
+    """Write a file, creating parent directories as needed (blocking)"""
+    abs_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(abs_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def _list_entries(abs_path: Path) -> list[str]:
+    """Format one line per directory entry (blocking)"""
+    # os.scandir caches file type and stat per entry, avoiding repeated stat calls
+    items = []
+    with os.scandir(abs_path) as entries:
+        for entry in entries:
+            item_type = "DIR " if entry.is_dir() else "FILE"
+            size = f"{entry.stat().st_size:>10} bytes" if entry.is_file() else ""
+            items.append(f"  {item_type} {entry.name:30} {size}")
+    return items
+
+
 # Create MCP server
 app = Server("simple-filesystem")
 
@@ -137,14 +143,14 @@ async def list_tools() -> list[types.Tool]:
 async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
     """Handle tool calls"""
     
+    # Disk I/O runs in a worker thread via asyncio.to_thread so the event
+    # loop keeps serving other requests while a read or write is in flight
     try:
         if name == "create_file":
             filepath = arguments["filepath"]
             content = arguments["content"]
             abs_path = _validate_path(filepath)
-            abs_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(abs_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            await asyncio.to_thread(_write_file, abs_path, content)
             return [types.TextContent(
                 type="text",
                 text=f"✓ File created successfully: {filepath}"
@@ -158,8 +164,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
                     type="text",
                     text=f"✗ File not found: {filepath}"
                 )]
-            with open(abs_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = await asyncio.to_thread(abs_path.read_text, encoding='utf-8')
             return [types.TextContent(type="text", text=content)]
         
         elif name == "list_directory":
@@ -176,11 +181,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
                     text=f"✗ Not a directory: {dirpath}"
                 )]
             
-            items = []
-            for item in abs_path.iterdir():
-                item_type = "DIR " if item.is_dir() else "FILE"
-                size = f"{item.stat().st_size:>10} bytes" if item.is_file() else ""
-                items.append(f"  {item_type} {item.name:30} {size}")
+            items = await asyncio.to_thread(_list_entries, abs_path)
             
             if not items:
                 result = f"Directory is empty: {dirpath}"
@@ -201,7 +202,7 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
                     compiled_code = compile(code, '<string>', 'exec')
                     exec(compiled_code, {})
                 except Exception as e:
-                    traceback.print_exc()
+                    traceback.print_exception(type(e), e, e.__traceback__)
             
             stdout_value = stdout_capture.getvalue()
             stderr_value = stderr_capture.getvalue()
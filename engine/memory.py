@@ -5,20 +5,36 @@ Uses sentence-transformers and FAISS for efficient retrieval
 
 import os
 import json
+import atexit
+import time
+import functools
+import importlib.util
 import numpy as np
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict
 
 # Try to import dependencies
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+# sentence-transformers pulls in torch, so it is only imported when the model is first needed
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
     print("⚠ sentence-transformers not installed. Run: pip install sentence-transformers")
 
+# Optional: run the embedding model through ONNX Runtime (pip install optimum[onnxruntime])
+ONNX_AVAILABLE = (
+    importlib.util.find_spec("optimum") is not None
+    and importlib.util.find_spec("onnxruntime") is not None
+)
+
+# Thread counts for FAISS (OpenMP) and torch. These override OMP_NUM_THREADS /
+# MKL_NUM_THREADS so FAISS search and model inference do not oversubscribe the CPU.
+CPU_COUNT = os.cpu_count() or 1
+FAISS_THREADS = max(1, CPU_COUNT - 1)
+TORCH_THREADS = max(1, CPU_COUNT // 2)
+
 try:
     import faiss
+    faiss.omp_set_num_threads(FAISS_THREADS)
     FAISS_AVAILABLE = True
 except ImportError:
     FAISS_AVAILABLE = False
@@ -27,25 +43,189 @@ except ImportError:
 
 # Configuration - Use relative path from this file
 MEMORY_DIR = Path(__file__).parent / "context"
-EMBED_FILE = MEMORY_DIR / "embeddings.npy"
-MEMORY_FILE = MEMORY_DIR / "memory.jsonl"
+MODEL_CACHE_DIR = Path(__file__).parent / "models"
+INDEX_FILE = MEMORY_DIR / "index.faiss"
+# Metadata is stored column-wise: one array per field plus an append-only text log
+ROLES_FILE = MEMORY_DIR / "roles.npy"
+TIMESTAMPS_FILE = MEMORY_DIR / "timestamps.npy"
+OFFSETS_FILE = MEMORY_DIR / "offsets.npy"
+TEXTS_FILE = MEMORY_DIR / "texts.jsonl"
+METADATA_FILES = (ROLES_FILE, TIMESTAMPS_FILE, OFFSETS_FILE, TEXTS_FILE)
 MODEL_NAME = "all-MiniLM-L6-v2"
-DIM = 384  # Dimension for all-MiniLM-L6-v2
+# Known embedding dimensions, so the index can be built without loading the model
+MODEL_DIMS = {
+    "all-MiniLM-L6-v2": 384,
+    "all-MiniLM-L12-v2": 384,
+    "all-mpnet-base-v2": 768,
+}
+# sentence-transformers' own max_seq_length per model. Stored memories are full
+# agent responses, so the ONNX encoder truncates at the same length, not shorter.
+MODEL_MAX_SEQ_LENGTHS = {
+    "all-MiniLM-L6-v2": 256,
+    "all-mpnet-base-v2": 384,
+}
+RESULT_CACHE_SIZE = 1024  # Cached retrieve_context results
+EMBED_CACHE_SIZE = 4096  # Cached query embeddings
+MMAP_THRESHOLD = 64 * 1024 * 1024  # Index files above this size are memory-mapped
+HNSW_THRESHOLD = 1000  # Exact flat search below this many memories, HNSW graph above
+HNSW_M = 32  # Graph neighbours per node
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 32
 
 # Initialize model (lazy loading)
 MODEL = None
 
+# Bumped on every store/clear so cached retrieval results are never stale
+_memory_version = 0
+
+# Query/stored text -> embedding, most recently used last
+_EMBED_CACHE = OrderedDict()
+
+# Resident FAISS index (loaded on first use) and whether it is a read-only mmap
+_INDEX = None
+_INDEX_READ_ONLY = False
+_INDEX_ON_GPU = False
+_GPU_RESOURCES = None
+
+# Resident metadata columns: file -> chunks, merged into one array on read.
+# Stores append a chunk instead of rewriting the .npy file.
+_COLUMNS: Dict[Path, List[np.ndarray]] = {}
+COLUMN_DTYPES = {ROLES_FILE: '<U1', TIMESTAMPS_FILE: 'i8', OFFSETS_FILE: 'i8'}
+
+# Whether the resident index and metadata columns have entries not yet on disk
+_MEMORY_DIRTY = False
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime replacement for SentenceTransformer.encode
+    
+    The model is exported to ONNX once and cached under MODEL_CACHE_DIR.
+    Encoding is tokenize -> session run -> mean pooling -> optional L2
+    normalization, matching the sentence-transformers pipeline for MiniLM.
+    """
+    
+    def __init__(self, model_name: str):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        
+        export_dir = MODEL_CACHE_DIR / f"{model_name}-onnx"
+        if export_dir.exists():
+            self.model = ORTModelForFeatureExtraction.from_pretrained(export_dir)
+            self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        else:
+            repo_id = f"sentence-transformers/{model_name}"
+            self.model = ORTModelForFeatureExtraction.from_pretrained(repo_id, export=True)
+            self.tokenizer = AutoTokenizer.from_pretrained(repo_id)
+            self.model.save_pretrained(export_dir)
+            self.tokenizer.save_pretrained(export_dir)
+        
+        self.max_seq_length = MODEL_MAX_SEQ_LENGTHS.get(model_name, self.tokenizer.model_max_length)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+    
+    def encode(self, texts: List[str], batch_size: int = 32, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """Encode texts to a (len(texts), dim) float32 array"""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            hidden = self.model(**tokens).last_hidden_state
+            
+            # Mean pooling over non-padding tokens
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            
+            if normalize_embeddings:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled)
+        
+        if not batches:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.concatenate(batches).astype(np.float32, copy=False)
+
+
+def _load_onnx_model():
+    """Load the ONNX Runtime encoder, or None if it cannot be used"""
+    if not ONNX_AVAILABLE:
+        return None
+    try:
+        return OnnxEncoder(MODEL_NAME)
+    except Exception as e:
+        print(f"⚠ ONNX Runtime encoder unavailable, using PyTorch: {e}")
+        return None
+
+
+def _configure_torch_threads():
+    """Size torch's intra-op pool and use a single inter-op thread"""
+    try:
+        import torch
+
+        torch.set_num_threads(TORCH_THREADS)
+        torch.set_num_interop_threads(1)
+    except Exception as e:
+        # set_num_interop_threads fails once torch has already run parallel work
+        print(f"⚠ Torch thread configuration skipped: {e}")
+
+
+def _optimize_model(model):
+    """Run inference in fp16 on GPU, or int8 dynamic-quantized on CPU"""
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            model = model.to("cuda").half()
+        else:
+            model[0].auto_model = torch.quantization.quantize_dynamic(
+                model[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    except Exception as e:
+        print(f"⚠ Model quantization skipped: {e}")
+
+    return model
+
 
 def get_model():
     """Lazy load the sentence transformer model"""
-    global MODEL
+    global MODEL, SENTENCE_TRANSFORMERS_AVAILABLE
     if MODEL is None and SENTENCE_TRANSFORMERS_AVAILABLE:
         print("Loading sentence transformer model...")
-        MODEL = SentenceTransformer(MODEL_NAME)
+        MODEL = _load_onnx_model()
+        if MODEL is not None:
+            print(f"✓ Model loaded: {MODEL_NAME} (ONNX Runtime)")
+            return MODEL
+        
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            # Installed but not importable (e.g. missing or incompatible torch)
+            print("⚠ sentence-transformers not installed. Run: pip install sentence-transformers")
+            SENTENCE_TRANSFORMERS_AVAILABLE = False
+            return None
+        
+        _configure_torch_threads()
+        MODEL = _optimize_model(SentenceTransformer(MODEL_NAME))
         print(f"✓ Model loaded: {MODEL_NAME}")
     return MODEL
 
 
+def get_embedding_dim() -> int:
+    """Embedding dimension of MODEL_NAME, loading the model only if it is unknown"""
+    if MODEL is None and MODEL_NAME in MODEL_DIMS:
+        return MODEL_DIMS[MODEL_NAME]
+    
+    model = get_model()
+    if model is None:
+        return MODEL_DIMS.get(MODEL_NAME, 384)
+    return model.get_sentence_embedding_dimension()
+
+
 def ensure_memory_dir():
     """Ensure memory directory exists"""
     MEMORY_DIR.mkdir(parents=True, exist_ok=True)
@@ -53,29 +233,262 @@ def ensure_memory_dir():
 
 def clear_memory():
     """Clear all stored memories and embeddings"""
+    global _memory_version, _INDEX, _INDEX_READ_ONLY, _INDEX_ON_GPU, _MEMORY_DIRTY
     ensure_memory_dir()
+    _memory_version += 1
+    _INDEX = None
+    _INDEX_READ_ONLY = False
+    _INDEX_ON_GPU = False
+    _MEMORY_DIRTY = False
+    _COLUMNS.clear()
     
     # Remove files if they exist
-    if EMBED_FILE.exists():
-        EMBED_FILE.unlink()
-    if MEMORY_FILE.exists():
-        MEMORY_FILE.unlink()
+    for path in (INDEX_FILE, *METADATA_FILES):
+        if path.exists():
+            path.unlink()
     
     print("🗑️  Memory cleared")
 
 
+def _as_float32(vectors: np.ndarray) -> np.ndarray:
+    """Return a C-contiguous float32 array, copying only when required"""
+    if vectors.dtype == np.float32 and vectors.flags['C_CONTIGUOUS']:
+        return vectors
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def _create_index():
+    """
+    Create an empty FAISS index
+    
+    Vectors are added with explicit IDs equal to their row in the metadata
+    columns, so lookups do not depend on FAISS insertion order and entries
+    can later be removed with remove_ids without reshuffling the metadata.
+    
+    Embeddings are L2-normalized when encoded, so inner product equals
+    cosine similarity and search is a single BLAS matrix product.
+    """
+    return faiss.IndexIDMap2(faiss.IndexFlatIP(get_embedding_dim()))
+
+
+def _is_hnsw(index) -> bool:
+    """Whether the ID-mapped index is backed by an HNSW graph"""
+    return isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW)
+
+
+def _build_hnsw(index):
+    """
+    Rebuild a flat index as an HNSW graph, keeping the entry IDs
+    
+    Flat search reads every stored vector per query; the graph visits
+    roughly log N of them, which pays off once the store is large. Graph
+    vectors are stored as int8 (4x smaller than float32), with the scalar
+    quantizer trained on the vectors stored so far.
+    """
+    vectors = faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal)
+    ids = faiss.vector_to_array(index.id_map)
+    
+    hnsw = faiss.IndexHNSWSQ(index.d, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    hnsw.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    hnsw.hnsw.efSearch = HNSW_EF_SEARCH
+    hnsw.train(vectors)
+    
+    upgraded = faiss.IndexIDMap2(hnsw)
+    upgraded.add_with_ids(vectors, ids)
+    return upgraded
+
+
+def _gpu_available() -> bool:
+    """Whether this FAISS build has GPU support and a GPU is present"""
+    return hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0
+
+
+def _index_to_gpu(index):
+    """Copy an index to GPU 0 (fp16 storage); returns (index, moved)"""
+    global _GPU_RESOURCES
+    try:
+        if _GPU_RESOURCES is None:
+            _GPU_RESOURCES = faiss.StandardGpuResources()
+        options = faiss.GpuClonerOptions()
+        options.useFloat16 = True
+        return faiss.index_cpu_to_gpu(_GPU_RESOURCES, 0, index, options), True
+    except Exception as e:
+        print(f"⚠ FAISS GPU index unavailable, using CPU: {e}")
+        return index, False
+
+
 def load_index():
-    """Load FAISS index from embeddings file"""
+    """
+    Return the FAISS index, loading it from disk on first use
+    
+    Large index files are memory-mapped read-only where faiss supports it
+    (IO_FLAG_MMAP_IFC maps the stored vectors themselves) so that processes
+    opening the same index share the OS page cache and pages are faulted in
+    lazily.
+    When a GPU is available the index is moved to it for search.
+    """
+    global _INDEX, _INDEX_READ_ONLY, _INDEX_ON_GPU
     if not FAISS_AVAILABLE:
         return None
     
-    if EMBED_FILE.exists():
-        vectors = np.load(EMBED_FILE)
-        index = faiss.IndexFlatL2(DIM)
-        index.add(vectors.astype('float32'))
-        return index
-    else:
-        return faiss.IndexFlatL2(DIM)
+    if _INDEX is None:
+        if INDEX_FILE.exists():
+            # Older faiss releases have no IO_FLAG_MMAP_IFC; load those into memory
+            mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+            _INDEX_READ_ONLY = (
+                mmap_flag is not None and INDEX_FILE.stat().st_size > MMAP_THRESHOLD
+            )
+            flags = mmap_flag | faiss.IO_FLAG_READ_ONLY if _INDEX_READ_ONLY else 0
+            _INDEX = faiss.read_index(str(INDEX_FILE), flags)
+        else:
+            _INDEX = _create_index()
+            _INDEX_READ_ONLY = False
+        
+        # HNSW graphs are searched on the CPU
+        if _gpu_available() and not _is_hnsw(_INDEX):
+            _INDEX, _INDEX_ON_GPU = _index_to_gpu(_INDEX)
+            # The GPU copy owns its data, so it is no longer backed by the mmap
+            _INDEX_READ_ONLY = _INDEX_READ_ONLY and not _INDEX_ON_GPU
+    
+    return _INDEX
+
+
+def _save_index(index):
+    """Write the index to INDEX_FILE, copying it back from the GPU if needed"""
+    if _INDEX_ON_GPU:
+        index = faiss.index_gpu_to_cpu(index)
+    faiss.write_index(index, str(INDEX_FILE))
+
+
+def persist_memory():
+    """
+    Write the resident FAISS index and metadata columns if they have unsaved entries
+    
+    Stores only update them in memory (texts still go straight to the
+    append-only log), so a run of stores does not rewrite whole files each
+    time. This runs at interpreter exit and can be called to checkpoint earlier.
+    """
+    global _MEMORY_DIRTY
+    if not _MEMORY_DIRTY:
+        return
+    if _INDEX is not None:
+        _save_index(_INDEX)
+    for path in COLUMN_DTYPES:
+        _save_column(path)
+    _MEMORY_DIRTY = False
+
+
+atexit.register(persist_memory)
+
+
+def _writable_index():
+    """Return the FAISS index, copying a read-only mmapped index into memory first"""
+    global _INDEX, _INDEX_READ_ONLY
+    load_index()
+    if _INDEX_READ_ONLY:
+        # clone_index would keep viewing the mapped pages, and growing a view
+        # aborts; the unmodified file is re-read into owned memory instead
+        _INDEX = faiss.read_index(str(INDEX_FILE))
+        _INDEX_READ_ONLY = False
+    return _INDEX
+
+
+def _load_column(path: Path, dtype) -> np.ndarray:
+    """Load a metadata column (memory-mapped), or an empty array if missing"""
+    if path.exists():
+        return np.load(path, mmap_mode='r')
+    return np.empty(0, dtype=dtype)
+
+
+def _column_chunks(path: Path) -> List[np.ndarray]:
+    """Resident chunks of a metadata column, loading the saved column on first use"""
+    chunks = _COLUMNS.get(path)
+    if chunks is None:
+        chunks = _COLUMNS[path] = [_load_column(path, COLUMN_DTYPES[path])]
+    return chunks
+
+
+def _column(path: Path) -> np.ndarray:
+    """A metadata column including unsaved rows"""
+    chunks = _column_chunks(path)
+    if len(chunks) > 1:
+        chunks[:] = [np.concatenate(chunks)]
+    return chunks[0]
+
+
+def _column_length(path: Path) -> int:
+    """Number of rows in a metadata column, without merging its chunks"""
+    return sum(len(chunk) for chunk in _column_chunks(path))
+
+
+def _append_column(path: Path, values: np.ndarray):
+    """Append values to a resident metadata column; persist_memory saves it"""
+    _column_chunks(path).append(values)
+
+
+def _save_column(path: Path):
+    """Write a resident metadata column to its .npy file"""
+    # Saved under a temporary name and swapped in, so a column still
+    # memory-mapped from the old file keeps reading valid data
+    tmp_path = path.with_name(path.stem + ".tmp.npy")
+    np.save(tmp_path, _column(path))
+    os.replace(tmp_path, path)
+
+
+def _append_metadata(roles: List[str], texts: List[str]):
+    """Append entries to the columnar metadata store"""
+    # Texts go to an append-only log; the offset column indexes into it
+    offsets = []
+    with open(TEXTS_FILE, "ab") as f:
+        for text in texts:
+            offsets.append(f.tell())
+            f.write(json.dumps(text, ensure_ascii=False).encode("utf-8") + b"\n")
+    
+    _append_column(ROLES_FILE, np.array(roles))
+    _append_column(TIMESTAMPS_FILE, np.full(len(texts), int(time.time()), dtype='i8'))
+    _append_column(OFFSETS_FILE, np.array(offsets, dtype='i8'))
+
+
+def _read_texts(offsets: np.ndarray) -> List[str]:
+    """Read the texts stored at the given byte offsets of the text log"""
+    texts = []
+    with open(TEXTS_FILE, "rb") as f:
+        for offset in offsets:
+            f.seek(int(offset))
+            texts.append(json.loads(f.readline()))
+    return texts
+
+
+def _encode_queries(model, queries: List[str]) -> np.ndarray:
+    """
+    Encode queries as one (n, dim) batch, reusing recently seen embeddings
+    
+    Only queries missing from the embedding cache reach the model, and they
+    are encoded together in a single call.
+    """
+    embeddings = {}
+    for query in queries:
+        embedding = _EMBED_CACHE.get(query)
+        if embedding is not None:
+            _EMBED_CACHE.move_to_end(query)
+            embeddings[query] = embedding
+    
+    missing = [query for query in dict.fromkeys(queries) if query not in embeddings]
+    if missing:
+        encoded = _as_float32(model.encode(missing, convert_to_numpy=True, normalize_embeddings=True))
+        embeddings.update(zip(missing, encoded))
+        _cache_embeddings(missing, encoded)
+    
+    return np.stack([embeddings[query] for query in queries])
+
+
+def _cache_embeddings(texts: List[str], embeddings: np.ndarray):
+    """Remember embeddings by text, evicting the least recently used"""
+    for text, embedding in zip(texts, embeddings):
+        _EMBED_CACHE[text] = embedding
+        _EMBED_CACHE.move_to_end(text)
+    while len(_EMBED_CACHE) > EMBED_CACHE_SIZE:
+        _EMBED_CACHE.popitem(last=False)
 
 
 def store_context(role: str, text: str):
@@ -86,41 +499,64 @@ def store_context(role: str, text: str):
         role: Agent role/name
         text: Response text to store
     """
+    store_contexts([role], [text])
+
+
+def store_contexts(roles: List[str], texts: List[str]):
+    """
+    Store several contexts at once
+    
+    All texts are encoded in one batched model call, added to the index in a
+    single FAISS call, and the index and metadata are written once.
+    
+    Args:
+        roles: Agent role/name for each text
+        texts: Response texts to store, in the same order as roles
+    """
+    global _memory_version, _INDEX, _MEMORY_DIRTY
+    roles, texts = list(roles), list(texts)
+    if len(roles) != len(texts):
+        raise ValueError("roles and texts must have the same length")
+    if not texts:
+        return
+    
     if not SENTENCE_TRANSFORMERS_AVAILABLE or not FAISS_AVAILABLE:
         # Fallback to simple storage
-        _fallback_store(role, text)
+        for role, text in zip(roles, texts):
+            _fallback_store(role, text)
         return
     
     ensure_memory_dir()
+    _memory_version += 1
     
     # Get model
     model = get_model()
     if model is None:
-        _fallback_store(role, text)
+        for role, text in zip(roles, texts):
+            _fallback_store(role, text)
         return
     
-    # Generate embedding
-    embedding = model.encode([text], convert_to_numpy=True)
-    
-    # Save embedding
-    if EMBED_FILE.exists():
-        vectors = np.load(EMBED_FILE)
-        vectors = np.vstack([vectors, embedding])
-    else:
-        vectors = embedding
-    
-    np.save(EMBED_FILE, vectors.astype('float32'))
+    # Generate embeddings
+    embeddings = _as_float32(
+        model.encode(texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+    )
+    # A text is often queried right after it is stored; keep its embedding
+    _cache_embeddings(texts, embeddings)
+    
+    # Add embeddings to the resident index; persist_memory writes it out
+    index = _writable_index()
+    first_id = _column_length(OFFSETS_FILE)  # Next metadata row
+    index.add_with_ids(embeddings, np.arange(first_id, first_id + len(texts), dtype='int64'))
+    # A GPU flat index is already fast enough, so only CPU indexes are upgraded
+    if index.ntotal >= HNSW_THRESHOLD and not _INDEX_ON_GPU and not _is_hnsw(index):
+        _INDEX = _build_hnsw(index)
     
     # Save raw text with metadata
-    memory_entry = {
-        "role": role,
-        "text": text
-    }
-    
-    with open(MEMORY_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(memory_entry, ensure_ascii=False) + "\n")
+    _append_metadata(roles, texts)
+    _MEMORY_DIRTY = True
     
-    print(f"💾 Stored memory: {role} ({len(text)} chars)")
+    for role, text in zip(roles, texts):
+        print(f"💾 Stored memory: {role} ({len(text)} chars)")
 
 
 def retrieve_context(query: str, k: int = 5) -> str:
@@ -138,66 +574,100 @@ def retrieve_context(query: str, k: int = 5) -> str:
         # Fallback to simple retrieval
         return _fallback_retrieve(query, k)
     
-    if not EMBED_FILE.exists() or not MEMORY_FILE.exists():
-        return ""
+    return _retrieve_cached(query, k, _memory_version)
+
+
+def retrieve_contexts(queries: List[str], k: int = 5) -> List[str]:
+    """
+    Retrieve relevant context for several queries at once
     
-    # Get model
-    model = get_model()
-    if model is None:
-        return _fallback_retrieve(query, k)
+    All queries are encoded in one model call and searched with a single
+    multi-query FAISS search, which is much cheaper than one call per query.
     
-    # Load vectors and create index
-    vectors = np.load(EMBED_FILE)
-    index = load_index()
+    Args:
+        queries: Query texts
+        k: Number of most relevant memories to retrieve per query
     
-    if index is None or index.ntotal == 0:
-        return ""
+    Returns:
+        One formatted context string per query, in the same order
+    """
+    if not SENTENCE_TRANSFORMERS_AVAILABLE or not FAISS_AVAILABLE:
+        # Fallback to simple retrieval
+        return [_fallback_retrieve(query, k) for query in queries]
     
-    # Generate query embedding
-    query_embedding = model.encode([query], convert_to_numpy=True).astype('float32')
+    return _retrieve_batch(list(queries), k)
+
+
+@functools.lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _retrieve_cached(query: str, k: int, version: int) -> str:
+    """
+    Semantic retrieval behind retrieve_context, memoized per query.
     
-    # Search for k most similar
-    k = min(k, index.ntotal)  # Don't search for more than available
-    distances, indices = index.search(query_embedding, k)
+    `version` is the memory version at call time; it is only part of the
+    cache key, so any store/clear makes earlier results unreachable.
+    """
+    return _retrieve_batch([query], k)[0]
+
+
+def _retrieve_batch(queries: List[str], k: int) -> List[str]:
+    """Semantic retrieval for a batch of queries"""
+    if not queries:
+        return []
     
-    # Retrieve relevant memories
-    memories = []
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    if not _column_length(OFFSETS_FILE):
+        return [""] * len(queries)
     
-    for idx in indices[0]:
-        if idx < len(lines):
-            memory = json.loads(lines[idx])
-            memories.append(memory)
+    # Load the index; an empty index needs no query encoding
+    index = load_index()
     
-    # Format as context string
-    if not memories:
-        return ""
+    if index is None or index.ntotal == 0:
+        return [""] * len(queries)
     
-    context_parts = []
-    for memory in memories:
-        role = memory.get("role", "Agent")
-        text = memory.get("text", "")
-        context_parts.append(f"{role}: {text}")
+    # Get model
+    model = get_model()
+    if model is None:
+        return [_fallback_retrieve(query, k) for query in queries]
     
-    context = "\n\n".join(context_parts)
-    print(f"🔍 Retrieved {len(memories)} relevant memories")
+    # Generate query embeddings
+    query_embeddings = _encode_queries(model, queries)
     
-    return context
+    # Search for k most similar
+    k = min(k, index.ntotal)  # Don't search for more than available
+    distances, indices = index.search(query_embeddings, k)
+    
+    # Retrieve relevant memories by gathering from the metadata columns
+    roles = _column(ROLES_FILE)
+    offsets = _column(OFFSETS_FILE)
+    
+    # FAISS pads missing results with -1; mask them out in one vectorized pass
+    valid = (indices >= 0) & (indices < len(offsets))
+    
+    contexts = []
+    for row, row_valid in zip(indices, valid):
+        hits = row[row_valid]
+        if not hits.size:
+            contexts.append("")
+            continue
+        
+        texts = _read_texts(offsets[hits])
+        contexts.append("\n\n".join(
+            f"{role}: {text}" for role, text in zip(roles[hits], texts)
+        ))
+        print(f"🔍 Retrieved {len(hits)} relevant memories")
+    
+    return contexts
 
 
 def get_memory_stats() -> Dict:
     """Get statistics about stored memories"""
     stats = {
         "total_memories": 0,
-        "embedding_dimension": DIM,
+        "embedding_dimension": get_embedding_dim(),
         "storage_path": str(MEMORY_DIR),
         "rag_available": SENTENCE_TRANSFORMERS_AVAILABLE and FAISS_AVAILABLE
     }
     
-    if MEMORY_FILE.exists():
-        with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-            stats["total_memories"] = sum(1 for _ in f)
+    stats["total_memories"] = _column_length(OFFSETS_FILE)
     
     return stats
 
@@ -5,6 +5,7 @@ Processes YAML configuration files to execute AI agent workflows.
 
 import argparse
 import sys
+import traceback
 import warnings
 from pathlib import Path
 from engine.Agent import run_agent
@@ -54,8 +55,7 @@ Examples:
         sys.exit(0)
     except Exception as e:
         print(f"\nError executing workflow: {e}")
-        import traceback
-        traceback.print_exc()
+        traceback.print_exception(type(e), e, e.__traceback__, file=sys.stderr)
         sys.exit(1)
 
 